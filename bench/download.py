@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: latin-1 -*- ######################################################
+#                                                                              #
+# download.py - measure download throughput of wordlistctl.                    #
+#                                                                              #
+# Synthetic wordlists in every supported format are served by a local HTTP     #
+# mirror with optional latency, bandwidth limit, Range support and failures,   #
+# and fetched through the real download path with a matching config.json.     #
+#                                                                              #
+################################################################################
+
+
+import bz2
+import getopt
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import lzma
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+
+__bench_dir__ = os.path.dirname(os.path.realpath(__file__))
+__script__ = os.path.join(os.path.dirname(__bench_dir__), "wordlistctl.py")
+__baseline__ = os.path.join(__bench_dir__, "baselines", "download.json")
+__runs__ = 3
+__files__ = 4
+__lines__ = 200000
+__latency__ = 0
+__bandwidth__ = 0
+__ranges__ = True
+__failures__ = 0
+__tolerance__ = 20
+__save__ = False
+__only__ = ""
+
+__formats__ = ["txt", "txt.gz", "txt.bz2", "txt.xz", "zip", "tar.gz", "tar.bz2",
+               "tar.xz", "7z", "rar"]
+
+__scenarios__ = [
+    ("-t 1", ["-t", "1"]),
+    ("-t 4", ["-t", "4"]),
+    ("-t 16", ["-t", "16"]),
+    ("-t 4 -M", ["-t", "4", "-M"]),
+    ("-t 4 -E async", ["-t", "4", "-E", "async"]),
+    ("-t 4 -L 64K", ["-t", "4", "-L", "64K"]),
+    ("-t 4 -L 1M", ["-t", "4", "-L", "1M"]),
+    ("-t 4 -X", ["-t", "4", "-X"]),
+    ("-t 4 -M -X", ["-t", "4", "-M", "-X"]),
+]
+
+
+def usage():
+    print("usage: {0} [-n <runs>] [-c <num>] [-z <lines>] [-l <ms>] [-w <bytes>] "
+          "[-R] [-x <pct>] [-m <str>] [-b <file>] [-t <pct>] [-s]\n".format(
+              os.path.basename(sys.argv[0])))
+    print("  -n <runs>    - runs per scenario (default: {0})".format(__runs__))
+    print("  -c <num>     - wordlists per format (default: {0})".format(__files__))
+    print("  -z <lines>   - lines per wordlist (default: {0})".format(__lines__))
+    print("  -l <ms>      - mirror latency per request (default: {0})".format(__latency__))
+    print("  -w <bytes>   - mirror bandwidth per connection (default: unlimited)")
+    print("  -R           - disable Range support on the mirror")
+    print("  -x <pct>     - fail the first request of <pct> percent of files (default: {0})".format(
+        __failures__))
+    print("  -m <str>     - only run scenarios containing <str>")
+    print("  -b <file>    - baseline file (default: {0})".format(__baseline__))
+    print("  -t <pct>     - allowed regression in percent (default: {0})".format(__tolerance__))
+    print("  -s           - save results as the new baseline")
+    print("  -H           - print this help and exit")
+
+
+def make_wordlist(seed, lines):
+    rnd = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz0123456789"
+    return "".join(["{0}\n".format("".join(rnd.choices(alphabet, k=rnd.randint(6, 14))))
+                    for _ in range(lines)]).encode()
+
+
+def make_archive(path, fmt, name, data, workdir):
+    if fmt == "txt":
+        with open(path, "wb") as fp:
+            fp.write(data)
+    elif fmt == "txt.gz":
+        with gzip.open(path, "wb") as fp:
+            fp.write(data)
+    elif fmt == "txt.bz2":
+        with bz2.open(path, "wb") as fp:
+            fp.write(data)
+    elif fmt == "txt.xz":
+        with lzma.open(path, "wb") as fp:
+            fp.write(data)
+    elif fmt == "zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as fp:
+            fp.writestr(name, data)
+    elif fmt.startswith("tar."):
+        with tarfile.open(path, "w:{0}".format(fmt.split(".")[1])) as fp:
+            info = tarfile.TarInfo(name)
+            info.size = data.__len__()
+            fp.addfile(info, io.BytesIO(data))
+    else:
+        source = os.path.join(workdir, name)
+        with open(source, "wb") as fp:
+            fp.write(data)
+        try:
+            if fmt == "7z" and shutil.which("7z") is not None:
+                command = ["7z", "a", "-bd", path, name]
+            elif fmt == "7z" and shutil.which("bsdtar") is not None:
+                command = ["bsdtar", "-a", "-cf", path, name]
+            elif fmt == "rar" and shutil.which("rar") is not None:
+                command = ["rar", "a", "-idq", path, name]
+            else:
+                return False
+            subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, check=True)
+        finally:
+            os.remove(source)
+    return True
+
+
+def make_mirror(path, workdir, files, lines):
+    os.makedirs(path, exist_ok=True)
+    categories = {}
+    for fmt in __formats__:
+        entries = []
+        for i in range(files):
+            stem = "bench-{0}-{1}".format(fmt.replace(".", ""), i)
+            filename = "{0}.{1}".format(stem, fmt)
+            name = "{0}.txt".format(stem)
+            data = make_wordlist("{0}-{1}".format(fmt, i), lines)
+            if not make_archive(os.path.join(path, filename), fmt, name, data, workdir):
+                break
+            with open(os.path.join(path, filename), "rb") as fp:
+                checksum = hashlib.md5(fp.read()).hexdigest()
+            entries.append({"name": stem,
+                            "size": [os.path.getsize(os.path.join(path, filename)),
+                                     data.__len__()],
+                            "sum": [checksum],
+                            "file": filename})
+        if entries.__len__() > 0:
+            categories[fmt.replace(".", "")] = entries
+    return categories
+
+
+def make_config(path, categories, port):
+    config = {}
+    for category, entries in categories.items():
+        files = [{"name": i["name"],
+                  "url": ["http://127.0.0.1:{0}/{1}".format(port, i["file"])],
+                  "sum": i["sum"],
+                  "size": i["size"]} for i in entries]
+        config[category] = {"count": files.__len__(),
+                            "size": [sum([i["size"][0] for i in files]),
+                                     sum([i["size"][1] for i in files])],
+                            "files": files}
+    with open(path, "w") as fp:
+        json.dump(config, fp)
+
+
+class Mirror(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    root = ""
+    failed = set()
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def fail_once(self):
+        if __failures__ <= 0:
+            return False
+        with self.lock:
+            if self.path in self.failed:
+                return False
+            if random.Random(self.path).random() * 100 >= __failures__:
+                return False
+            self.failed.add(self.path)
+        return True
+
+    def reply(self, body):
+        if __latency__ > 0:
+            time.sleep(__latency__ / 1000)
+        path = os.path.join(self.root, os.path.basename(self.path.split("?")[0]))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        if body and self.fail_once():
+            self.send_error(503)
+            return
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        code = 200
+        ranges = self.headers.get("Range", "")
+        if __ranges__ and ranges.startswith("bytes="):
+            first, last = ranges[6:].split(",")[0].split("-")
+            start = int(first)
+            end = min(int(last), size - 1) if last != "" else size - 1
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", "bytes */{0}".format(size))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            code = 206
+        self.send_response(code)
+        self.send_header("ETag", '"{0:x}-{1:x}"'.format(
+            int(os.path.getmtime(path)), size))
+        if __ranges__:
+            self.send_header("Accept-Ranges", "bytes")
+        if code == 206:
+            self.send_header("Content-Range", "bytes {0}-{1}/{2}".format(start, end, size))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if not body:
+            return
+        with open(path, "rb") as fp:
+            fp.seek(start)
+            left = end - start + 1
+            while left > 0:
+                begin = time.monotonic()
+                data = fp.read(min(65536, left))
+                self.wfile.write(data)
+                left -= data.__len__()
+                if __bandwidth__ > 0:
+                    time.sleep(max(data.__len__() / __bandwidth__ -
+                                   (time.monotonic() - begin), 0))
+
+    def do_GET(self):
+        self.reply(True)
+
+    def do_HEAD(self):
+        self.reply(False)
+
+
+def start_mirror(path):
+    Mirror.root = path
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Mirror)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def run(argv, output, report):
+    shutil.rmtree(output, ignore_errors=True)
+    if os.path.isfile(report):
+        os.remove(report)
+    Mirror.failed = set()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable] + argv, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+    failed = 0 if proc.returncode == 0 else 1
+    if os.path.isfile(report):
+        with open(report, "r") as fp:
+            failed = max(json.load(fp)["count"], failed)
+    return {"seconds": elapsed,
+            "cpu": usage.ru_utime + usage.ru_stime,
+            "rss": usage.ru_maxrss / 1024,
+            "failed": failed}
+
+
+def bench(workdir, categories):
+    script = os.path.join(workdir, "wordlistctl.py")
+    output = os.path.join(workdir, "wordlists")
+    report = os.path.join(workdir, "failed.json")
+    files = sum([i.__len__() for i in categories.values()])
+    size = sum([j["size"][0] for i in categories.values() for j in i])
+    results = {}
+    for name, options in __scenarios__:
+        if __only__ not in name:
+            continue
+        if "-X" in options and importlib.util.find_spec("libarchive") is None:
+            print("skipping {0}: -X needs the libarchive module".format(name))
+            continue
+        argv = [script, "-C", "-d", output, "-f", "0", "-W", report, "-y",
+                "network={0},checksum=0,extract=0".format(
+                    3 if __failures__ > 0 else 0)] + options
+        samples = [run(argv, output, report) for _ in range(__runs__)]
+        seconds = statistics.median([i["seconds"] for i in samples])
+        results[name] = {"seconds": round(seconds, 3),
+                         "files": round(files / seconds, 2),
+                         "mbytes": round(size / seconds / 1000 ** 2, 2),
+                         "cpu": round(statistics.median([i["cpu"] for i in samples]), 3),
+                         "rss": round(max([i["rss"] for i in samples]), 1),
+                         "failed": max([i["failed"] for i in samples])}
+    shutil.rmtree(output, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline):
+    regressions = 0
+    print("{0:<16} {1:>9} {2:>9} {3:>10} {4:>8} {5:>9} {6:>7} {7:>10}".format(
+        "scenario", "seconds", "files/s", "MB/s", "cpu", "rss", "failed", "baseline"))
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("mbytes")
+        mark = ""
+        if result["failed"] > 0:
+            mark = "  FAILED"
+            regressions += 1
+        elif base is not None and result["mbytes"] < base * (1 - __tolerance__ / 100):
+            mark = "  REGRESSION"
+            regressions += 1
+        print("{0:<16} {1:>8.2f}s {2:>9.1f} {3:>10.2f} {4:>7.2f}s {5:>7.1f}MB {6:>7} {7:>10}{8}".format(
+            name, result["seconds"], result["files"], result["mbytes"], result["cpu"],
+            result["rss"], result["failed"],
+            "-" if base is None else "{0:.2f}".format(base), mark))
+    return regressions
+
+
+def main(argv):
+    global __runs__
+    global __files__
+    global __lines__
+    global __latency__
+    global __bandwidth__
+    global __ranges__
+    global __failures__
+    global __only__
+    global __baseline__
+    global __tolerance__
+    global __save__
+    try:
+        opts, _ = getopt.getopt(argv[1:], "HRsn:c:z:l:w:x:m:b:t:")
+    except getopt.GetoptError as ex:
+        print("error: {0}".format(str(ex)), file=sys.stderr)
+        return 2
+    for opt, arg in opts:
+        if opt == "-H":
+            usage()
+            return 0
+        elif opt == "-n":
+            __runs__ = int(arg)
+        elif opt == "-c":
+            __files__ = int(arg)
+        elif opt == "-z":
+            __lines__ = int(arg)
+        elif opt == "-l":
+            __latency__ = float(arg)
+        elif opt == "-w":
+            __bandwidth__ = int(arg)
+        elif opt == "-R":
+            __ranges__ = False
+        elif opt == "-x":
+            __failures__ = float(arg)
+        elif opt == "-m":
+            __only__ = arg
+        elif opt == "-b":
+            __baseline__ = arg
+        elif opt == "-t":
+            __tolerance__ = float(arg)
+        elif opt == "-s":
+            __save__ = True
+
+    workdir = tempfile.mkdtemp(prefix="wordlistctl-download-")
+    server = None
+    try:
+        shutil.copy(__script__, workdir)
+        categories = make_mirror(os.path.join(workdir, "mirror"), workdir,
+                                 __files__, __lines__)
+        server = start_mirror(os.path.join(workdir, "mirror"))
+        make_config(os.path.join(workdir, "config.json"), categories,
+                    server.server_address[1])
+        print("formats: {0}\n".format(", ".join(categories.keys())))
+        results = bench(workdir, categories)
+    finally:
+        if server is not None:
+            server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.isfile(__baseline__):
+        with open(__baseline__, "r") as fp:
+            baseline = json.load(fp)
+    regressions = compare(results, baseline)
+    if __save__:
+        os.makedirs(os.path.dirname(__baseline__), exist_ok=True)
+        with open(__baseline__, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+        print("baseline saved to {0}".format(__baseline__))
+        return 0
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: latin-1 -*- ######################################################
+#                                                                              #
+# startup.py - measure cold-start latency of wordlistctl subcommands.          #
+#                                                                              #
+# Every run starts a fresh interpreter against a copy of wordlistctl.py and a  #
+# synthetic config.json, so results do not depend on the installed catalog.   #
+#                                                                              #
+################################################################################
+
+
+import getopt
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+__bench_dir__ = os.path.dirname(os.path.realpath(__file__))
+__script__ = os.path.join(os.path.dirname(__bench_dir__), "wordlistctl.py")
+__baseline__ = os.path.join(__bench_dir__, "baselines", "startup.json")
+__runs__ = 10
+__entries__ = 2900
+__tolerance__ = 20
+__save__ = False
+
+__commands__ = [
+    ["-V"],
+    ["-H"],
+    ["-c", "?"],
+    ["-f", "?"],
+    ["-F", "password"],
+    ["-S", "rock"],
+    ["-s", "rock", "-d", "{wordlists}"],
+]
+
+
+def usage():
+    print("usage: {0} [-n <runs>] [-e <entries>] [-b <file>] [-t <pct>] [-s]\n".format(
+        os.path.basename(sys.argv[0])))
+    print("  -n <runs>    - runs per command (default: {0})".format(__runs__))
+    print("  -e <num>     - synthetic catalog entries (default: {0})".format(__entries__))
+    print("  -b <file>    - baseline file (default: {0})".format(__baseline__))
+    print("  -t <pct>     - allowed regression in percent (default: {0})".format(__tolerance__))
+    print("  -s           - save results as the new baseline")
+    print("  -H           - print this help and exit")
+
+
+def make_config(path, entries):
+    categories = ["username", "password", "discovery", "fuzzing", "misc"]
+    config = {}
+    for i, category in enumerate(categories):
+        files = []
+        for j in range(i, entries, categories.__len__()):
+            name = "{0}-rockyou-{1}.txt.gz".format(category, j)
+            files.append({"name": name,
+                          "url": ["http://127.0.0.1/{0}".format(name)],
+                          "sum": ["SKIP"],
+                          "size": [j * 1000, j * 4000]})
+        config[category] = {"count": files.__len__(),
+                            "size": [0, 0],
+                            "files": files}
+    with open(path, "w") as fp:
+        json.dump(config, fp)
+
+
+def make_wordlists(path, count):
+    for i in range(count):
+        directory = os.path.join(path, "category{0}".format(i % 10))
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, "rockyou-{0}.txt".format(i)), "w").close()
+
+
+def run(argv):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable] + argv, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT)
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        output = proc.stdout.decode("utf-8", "replace").strip().splitlines()
+        errors = [i for i in output if "[-]" in i] or output or ["no output"]
+        raise RuntimeError("{0} exited with {1}: {2}".format(
+            " ".join(argv[1:]), proc.returncode, errors[-1]))
+    return elapsed
+
+
+def bench(workdir):
+    script = os.path.join(workdir, "wordlistctl.py")
+    wordlists = os.path.join(workdir, "wordlists")
+    results = {}
+    for command in __commands__:
+        argv = [script, "-C"] + [i.format(wordlists=wordlists) for i in command]
+        name = " ".join(command).replace("{wordlists}", "<dir>")
+        cache = os.path.join(workdir, "config.cache")
+        if os.path.isfile(cache):
+            os.remove(cache)
+        first = run(argv)
+        samples = [run(argv) for _ in range(__runs__)]
+        results[name] = {"first": round(first, 2),
+                         "median": round(statistics.median(samples), 2),
+                         "min": round(min(samples), 2)}
+    return results
+
+
+def compare(results, baseline):
+    regressions = 0
+    print("{0:<24} {1:>10} {2:>10} {3:>10} {4:>10}".format(
+        "command", "first", "median", "min", "baseline"))
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("median")
+        mark = ""
+        if base is not None and result["median"] > base * (1 + __tolerance__ / 100) + 5:
+            mark = "  REGRESSION"
+            regressions += 1
+        print("{0:<24} {1:>8.1f}ms {2:>8.1f}ms {3:>8.1f}ms {4:>10}{5}".format(
+            name, result["first"], result["median"], result["min"],
+            "-" if base is None else "{0:.1f}ms".format(base), mark))
+    return regressions
+
+
+def main(argv):
+    global __runs__
+    global __entries__
+    global __baseline__
+    global __tolerance__
+    global __save__
+    try:
+        opts, _ = getopt.getopt(argv[1:], "Hsn:e:b:t:")
+    except getopt.GetoptError as ex:
+        print("error: {0}".format(str(ex)), file=sys.stderr)
+        return 2
+    for opt, arg in opts:
+        if opt == "-H":
+            usage()
+            return 0
+        elif opt == "-n":
+            __runs__ = int(arg)
+        elif opt == "-e":
+            __entries__ = int(arg)
+        elif opt == "-b":
+            __baseline__ = arg
+        elif opt == "-t":
+            __tolerance__ = float(arg)
+        elif opt == "-s":
+            __save__ = True
+
+    workdir = tempfile.mkdtemp(prefix="wordlistctl-startup-")
+    try:
+        shutil.copy(__script__, workdir)
+        make_config(os.path.join(workdir, "config.json"), __entries__)
+        make_wordlists(os.path.join(workdir, "wordlists"), 1000)
+        results = bench(workdir)
+    except RuntimeError as ex:
+        print("error: {0}".format(str(ex)), file=sys.stderr)
+        return 2
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.isfile(__baseline__):
+        with open(__baseline__, "r") as fp:
+            baseline = json.load(fp)
+    regressions = compare(results, baseline)
+    if __save__:
+        os.makedirs(os.path.dirname(__baseline__), exist_ok=True)
+        with open(__baseline__, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+        print("baseline saved to {0}".format(__baseline__))
+        return 0
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))